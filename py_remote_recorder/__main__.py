@@ -4,35 +4,92 @@ along with optional Ngrok support to expose the server publicly.
 """
 
 import argparse
-import json
+import importlib
 import os
-import subprocess
 import threading
 import time
+from contextlib import asynccontextmanager
 
-import requests
 import uvicorn
 from fastapi import FastAPI
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-from py_remote_recorder.backend.audio_record_functions import (
-    record_audio,
-    stop_audio_recording,
-)
-from py_remote_recorder.backend.video_record_functions import (
-    start_screen_recording,
-    stop_screen_recording,
+from py_remote_recorder.backend.recording_index import (
+    discard_index,
+    index_path,
+    index_status,
+    thumbnails_dir,
 )
+from py_remote_recorder.backend.tunnel_manager import TUNNEL_PROVIDERS, TunnelManager
 from py_remote_recorder.utils import get_logger
 
-app = FastAPI()
-
 # Global variables to store the output file names
 screen_output_file = None
 audio_output_file = None
+tunnel_manager = None
 logger = get_logger()
 
+# Recording backends, kept off the module import path so that the server starts
+# quickly and audio-only or video-only hosts do not need the other stack installed
+BACKEND_MODULES = {
+    "audio": "py_remote_recorder.backend.audio_record_functions",
+    "video": "py_remote_recorder.backend.video_record_functions",
+}
+loaded_backends = {}
+# Backends whose dependencies failed to import, with the error message
+unavailable_backends = {}
+
+
+def load_backend(name):
+    """
+    Import a recording backend the first time it is needed.
+
+    Args:
+        name (str): Either "audio" or "video".
+
+    Returns:
+        module: The backend module.
+
+    Raises:
+        ImportError: If the backend dependencies are not installed.
+    """
+    if name in unavailable_backends:
+        raise ImportError(unavailable_backends[name])
+    if name not in loaded_backends:
+        loaded_backends[name] = importlib.import_module(BACKEND_MODULES[name])
+    return loaded_backends[name]
+
+
+def warm_up_backends():
+    """
+    Import every recording backend so that the first start request is not
+    delayed by OpenCV or PyAudio imports. Missing backends are marked unavailable.
+    """
+    for name in BACKEND_MODULES:
+        started = time.perf_counter()
+        try:
+            load_backend(name)
+        except (ImportError, OSError) as error:
+            unavailable_backends[name] = f"The {name} backend is unavailable: {error}"
+            logger.warning("%s", unavailable_backends[name])
+        else:
+            logger.info(
+                "Loaded the %s backend in %.0f ms.",
+                name,
+                (time.perf_counter() - started) * 1000,
+            )
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    """Warm up the recording backends in the background once the server starts."""
+    threading.Thread(target=warm_up_backends, daemon=True).start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+
 
 # Model to accept screen selection
 class ScreenSelection(BaseModel):
@@ -55,20 +112,27 @@ def start_screen_recording_api(selection: ScreenSelection):
     """
     global screen_output_file
     try:
+        backend = load_backend("video")
+
         # Generate the output file name based on screen index
         screen_output_file = f"output_screen_{selection.screen_index}.mp4"
 
+        # Mark the index pending before the recording thread starts
+        generation = discard_index(screen_output_file)
+
         # Run the recording in a separate thread to avoid blocking the API
         threading.Thread(
-            target=start_screen_recording,
+            target=backend.start_screen_recording,
             args=(selection.screen_index, screen_output_file),
+            kwargs={"generation": generation},
         ).start()
         return {
             "status": "Recording started",
             "screen_index": selection.screen_index,
             "output_file": screen_output_file,
+            "request_handled_at": time.time(),
         }
-    except ValueError as error:
+    except (ImportError, ValueError) as error:
         return {"error": str(error)}
 
 
@@ -99,7 +163,9 @@ def stop_screen_recording_api():
         FileResponse: The recorded video file or an error message if not found.
     """
     global screen_output_file
-    stop_screen_recording()  # Stop the recording process
+    # Stop the recording process, if the video backend was ever started
+    if "video" in loaded_backends:
+        loaded_backends["video"].stop_screen_recording()
 
     # Ensure the file is fully written and closed
     if screen_output_file and os.path.exists(screen_output_file):
@@ -124,14 +190,24 @@ def start_audio_recording_api():
     """
     global audio_output_file
     try:
+        backend = load_backend("audio")
+
         # Generate the output audio file name
         audio_output_file = "output_audio.wav"
 
+        # Mark the index pending before the recording thread starts
+        generation = discard_index(audio_output_file)
+
         # Run the recording in a separate thread to avoid blocking the API
-        threading.Thread(target=record_audio, args=(audio_output_file,)).start()
+        threading.Thread(
+            target=backend.record_audio,
+            args=(audio_output_file,),
+            kwargs={"generation": generation},
+        ).start()
         return {
             "status": "Audio recording started",
             "output_file": audio_output_file,
+            "request_handled_at": time.time(),
         }
     except Exception as error:  # pylint: disable=broad-except
         return {"error": str(error)}
@@ -147,7 +223,9 @@ def stop_audio_recording_api():
         StreamingResponse: The recorded audio file or error message.
     """
     global audio_output_file
-    stop_audio_recording()  # Stop the recording process
+    # Stop the recording process, if the audio backend was ever started
+    if "audio" in loaded_backends:
+        loaded_backends["audio"].stop_audio_recording()
 
     # Check if the audio file exists before streaming it
     if audio_output_file and os.path.exists(audio_output_file):
@@ -162,6 +240,99 @@ def stop_audio_recording_api():
     return {"status": "No audio recording found or recording was not started properly."}
 
 
+def last_output_file(kind):
+    """
+    Return the output file of the last recording of a given kind.
+
+    Args:
+        kind (str): Either "video" or "audio".
+
+    Returns:
+        str: The path to the recording, or None if nothing was recorded.
+    """
+    return {"video": screen_output_file, "audio": audio_output_file}.get(kind)
+
+
+# API endpoint to retrieve the seek/preview index of the last recording
+@app.get("/recording-index/{kind}/")
+def recording_index_api(kind: str):
+    """
+    Return the sidecar index (keyframes, thumbnails, waveform, activity) of the
+    last video or audio recording.
+
+    Args:
+        kind (str): Either "video" or "audio".
+
+    Returns:
+        FileResponse: The JSON index, or a status message while it is generated.
+    """
+    output_file = last_output_file(kind)
+    status = index_status.get(output_file)
+    if status == "pending":
+        return JSONResponse({"status": "Index is being generated."}, status_code=202)
+    if status == "ready" and os.path.exists(index_path(output_file)):
+        return FileResponse(index_path(output_file), media_type="application/json")
+    if status == "failed":
+        return JSONResponse(
+            {"status": "Index generation failed for this recording."}, status_code=404
+        )
+    return JSONResponse(
+        {"status": "No index found for this recording."}, status_code=404
+    )
+
+
+# API endpoint to retrieve a thumbnail listed in the video index
+@app.get("/recording-index/video/thumbnails/{name}")
+def recording_thumbnail_api(name: str):
+    """
+    Return a JPEG thumbnail of the last video recording.
+
+    Args:
+        name (str): The thumbnail file name, as listed in the index.
+
+    Returns:
+        FileResponse: The JPEG thumbnail or an error message if not found.
+    """
+    output_file = last_output_file("video")
+    if output_file and index_status.get(output_file) == "ready":
+        # Only plain file names are accepted, never paths
+        thumbnail = os.path.join(thumbnails_dir(output_file), os.path.basename(name))
+        if os.path.isfile(thumbnail):
+            return FileResponse(thumbnail, media_type="image/jpeg")
+    return JSONResponse({"status": "Thumbnail not found."}, status_code=404)
+
+
+# API endpoint to retrieve the public tunnel URL
+@app.get("/tunnel/")
+def tunnel_status_api():
+    """
+    Return the public URL and state of the tunnel exposing this server.
+
+    Returns:
+        dict: The tunnel status, or a message if no tunnel is used.
+    """
+    if tunnel_manager is None:
+        return {"status": "No tunnel used."}
+    return tunnel_manager.status()
+
+
+def start_tunnel(server_port, provider="ngrok", timeout=15.0):
+    """
+    Start a supervised tunnel for the given port.
+
+    Args:
+        server_port (int): The local server port to expose.
+        provider (str): The tunnel provider, "ngrok" or the offline "local" stand-in.
+        timeout (float): Seconds to wait for the tunnel to become ready.
+
+    Returns:
+        str: The public URL of the tunnel or None if failed.
+    """
+    global tunnel_manager
+    tunnel_manager = TunnelManager(server_port, provider=provider, timeout=timeout)
+    return tunnel_manager.start()
+
+
 def start_ngrok(ngrok_port):
     """
     Start Ngrok tunnel for the given port.
@@ -172,19 +343,7 @@ def start_ngrok(ngrok_port):
     Returns:
         str: The public URL of the Ngrok tunnel or None if failed.
     """
-    ngrok_command = f"ngrok http {ngrok_port}"
-    with subprocess.Popen(ngrok_command.split(), stdout=subprocess.PIPE):
-        time.sleep(2)
-
-    try:
-        ngrok_url = "http://localhost:4040/api/tunnels"
-        tunnel_info = requests.get(ngrok_url).text
-        tunnel_data = json.loads(tunnel_info)
-        public_url = tunnel_data["tunnels"][0]["public_url"]
-        return public_url
-    except Exception as error:  # pylint: disable=broad-except
-        logger.error("Error retrieving Ngrok URL: %s", error)
-        return None
+    return start_tunnel(ngrok_port, provider="ngrok")
 
 
 def parse_args():
@@ -201,6 +360,17 @@ def parse_args():
     parser.add_argument(
         "--use-ngrok", action="store_true", help="Use Ngrok to expose the local server"
     )
+    parser.add_argument(
+        "--tunnel",
+        choices=sorted(TUNNEL_PROVIDERS),
+        help="Expose the server through a tunnel ('local' is an offline stand-in)",
+    )
+    parser.add_argument(
+        "--tunnel-timeout",
+        type=float,
+        default=15.0,
+        help="Seconds to wait for the tunnel to become ready",
+    )
     return parser.parse_args()
 
 
@@ -213,7 +383,7 @@ def log_ngrok_root(public_url):
     """
     blue = "\033[94m"
     reset = "\033[0m"
-    logger.info("Ngrok tunnel started at %s%s%s", blue, public_url, reset)
+    logger.info("Tunnel started at %s%s%s", blue, public_url, reset)
 
 
 def main():
@@ -225,15 +395,22 @@ def main():
     args = parse_args()
     server_port = args.port
 
-    # Start Ngrok if specified
-    if args.use_ngrok:
-        public_ngrok_url = start_ngrok(server_port)
-        if public_ngrok_url:
-            log_ngrok_root(public_ngrok_url)
+    # Start the tunnel if specified
+    provider = args.tunnel or ("ngrok" if args.use_ngrok else None)
+    if provider:
+        public_url = start_tunnel(
+            server_port, provider=provider, timeout=args.tunnel_timeout
+        )
+        if public_url:
+            log_ngrok_root(public_url)
         else:
-            logger.error("Ngrok failed to start.")
+            logger.error("Tunnel failed to start.")
     else:
         logger.info("Ngrok not used.")
 
     logger.info("Starting FastAPI on port %d...", server_port)
-    uvicorn.run(app, host="0.0.0.0", port=server_port)
+    try:
+        uvicorn.run(app, host="0.0.0.0", port=server_port)
+    finally:
+        if tunnel_manager is not None:
+            tunnel_manager.stop()
@@ -7,6 +7,11 @@ import wave
 
 import pyaudio
 
+from py_remote_recorder.backend.recording_index import (
+    discard_index,
+    mark_index_failed,
+    start_index_build,
+)
 from py_remote_recorder.utils import get_logger
 
 # Global flag to signal when to stop the audio recording
@@ -21,16 +26,39 @@ CHUNK = 1024
 logger = get_logger()
 
 
-def record_audio(output_file="output_audio.wav"):
+def record_audio(output_file="output_audio.wav", generation=None):
     """
     Function to record audio and save it to a .wav file.
 
     Args:
         output_file (str): The path to the output .wav file (default: 'output_audio.wav').
+        generation (int): Index generation from discard_index, if already taken.
     """
     global stop_audio_recording_flag
     stop_audio_recording_flag = False  # Reset the flag at the beginning
 
+    # Remove the index of a previous recording with the same file name
+    if generation is None:
+        generation = discard_index(output_file)
+
+    try:
+        save_audio(output_file)
+    except Exception:
+        # No index will be built, so do not leave it pending
+        mark_index_failed(output_file, generation)
+        raise
+
+    # Build the waveform index once the file is complete
+    start_index_build(output_file, "audio", generation)
+
+
+def save_audio(output_file):
+    """
+    Record audio until the stop flag is set and save it to a .wav file.
+
+    Args:
+        output_file (str): The path to the output .wav file.
+    """
     # Initialize PyAudio instance
     audio_interface = pyaudio.PyAudio()
 
@@ -122,6 +122,31 @@ def stop_audio_recording(end_point: str):
     return None
 
 
+def get_recording_index(end_point: str, kind: str = "video"):
+    """
+    Sends a GET request to retrieve the seek/preview index of the last recording.
+
+    Args:
+        end_point (str): The endpoint URL of the recording server.
+        kind (str): Either "video" or "audio".
+
+    Returns:
+        dict: The recording index, or None if it is not available yet.
+    """
+    url = f"{end_point}/recording-index/{kind}/"
+
+    # Send the GET request to retrieve the index
+    response = requests.get(url, timeout=10)
+
+    if response.status_code == 200:
+        logger.info("Recording index retrieved.")
+        return response.json()
+    logger.error(
+        "Recording index not available: %d, %s", response.status_code, response.text
+    )
+    return None
+
+
 def save_binary_file(data: bytes, output_file: str):
     """
     Saves binary data to a file.
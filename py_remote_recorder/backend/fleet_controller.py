@@ -0,0 +1,502 @@
+"""
+This module provides a fleet controller that drives many recorder hosts at once.
+Start and stop requests are fanned out concurrently with asyncio so that a
+synchronized start does not accumulate seconds of skew across hosts, and the
+recorded files are downloaded in parallel with bounded concurrency.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+
+from py_remote_recorder.utils import get_logger
+
+logger = get_logger()
+
+# Endpoints and file extensions for each recording mode
+MODES = {
+    "video": {
+        "start": "/start-screen-recording/",
+        "stop": "/stop-screen-recording/",
+        "extension": ".mp4",
+    },
+    "audio": {
+        "start": "/start-audio-recording/",
+        "stop": "/stop-audio-recording/",
+        "extension": ".wav",
+    },
+}
+
+
+@dataclass
+class HostResult:  # pylint: disable=too-many-instance-attributes
+    """Outcome of a single request sent to one recorder host."""
+
+    end_point: str
+    ok: bool
+    sent_at: float
+    acked_at: float
+    status_code: Optional[int] = None
+    payload: Optional[dict] = None
+    output_file: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def midpoint(self) -> float:
+        """Best client-side estimate of when the host handled the request."""
+        return (self.sent_at + self.acked_at) / 2
+
+
+@dataclass
+class SkewReport:
+    """Per-host start-time offsets relative to the earliest host."""
+
+    offsets: dict = field(default_factory=dict)
+    handled_offsets: dict = field(default_factory=dict)
+
+    @property
+    def max_skew(self) -> float:
+        """Spread in seconds between the first and the last host to start."""
+        return max(self.offsets.values(), default=0.0)
+
+
+def compute_start_skew(results: list[HostResult]) -> SkewReport:
+    """
+    Compute the per-host start-time skew from a list of start results.
+
+    Client-side offsets are based on the midpoint of each request round trip.
+    If the hosts reported the ``request_handled_at`` timestamp of their start
+    endpoint, the spread of those is computed too. It measures when each server
+    handled the request, not when its first frame or chunk was captured, and is
+    only meaningful with synced clocks.
+
+    Args:
+        results (list[HostResult]): Results returned by ``FleetController.start``.
+
+    Returns:
+        SkewReport: The offsets of each successful host, in seconds.
+    """
+    report = SkewReport()
+    succeeded = [result for result in results if result.ok]
+    if not succeeded:
+        return report
+
+    first = min(result.midpoint for result in succeeded)
+    report.offsets = {result.end_point: result.midpoint - first for result in succeeded}
+
+    handled = {
+        result.end_point: result.payload["request_handled_at"]
+        for result in succeeded
+        if result.payload and "request_handled_at" in result.payload
+    }
+    if handled:
+        first_handled = min(handled.values())
+        report.handled_offsets = {
+            end_point: handled_at - first_handled
+            for end_point, handled_at in handled.items()
+        }
+    return report
+
+
+def output_file_for(end_point: str, mode: str, output_dir: str = ".") -> str:
+    """
+    Build a local output file name for a host, e.g. ``192.168.1.9_8000.mp4``.
+
+    Args:
+        end_point (str): The endpoint URL of the recording server.
+        mode (str): Either ``"video"`` or ``"audio"``.
+        output_dir (str): The directory where the file will be written.
+
+    Returns:
+        str: The path to the output file.
+    """
+    netloc = urlparse(end_point).netloc or end_point
+    name = netloc.replace(":", "_").replace("/", "_")
+    return os.path.join(output_dir, name + MODES[mode]["extension"])
+
+
+class FleetController:
+    """
+    Concurrent controller for a fleet of recorder hosts.
+
+    Each host gets its own ``requests.Session`` so that connections are kept
+    alive between start and stop, and blocking requests run on a dedicated
+    thread pool sized to the fleet so that no host waits for a free worker.
+    """
+
+    def __init__(
+        self,
+        end_points: list[str],
+        max_concurrency: int = 4,
+        timeout: float = 10.0,
+    ):
+        """
+        Args:
+            end_points (list[str]): The endpoint URLs of the recording servers.
+            max_concurrency (int): Maximum number of parallel downloads.
+            timeout (float): Timeout in seconds for connecting and acknowledging.
+        """
+        if not end_points:
+            raise ValueError("At least one end point is required")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.end_points = [end_point.rstrip("/") for end_point in end_points]
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._sessions = {
+            end_point: requests.Session() for end_point in self.end_points
+        }
+        self._executor = ThreadPoolExecutor(max_workers=len(self.end_points))
+
+    def close(self):
+        """Close all HTTP sessions and shut down the worker threads."""
+        for session in self._sessions.values():
+            session.close()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _post(self, end_point: str, path: str, payload=None, stream=False):
+        """
+        Send a POST request to one host and time its acknowledgement.
+
+        Returns:
+            tuple: The response (or None on failure) and a HostResult.
+        """
+        sent_at = time.time()
+        try:
+            response = self._sessions[end_point].post(
+                f"{end_point}{path}",
+                json=payload,
+                stream=stream,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as error:
+            return None, HostResult(
+                end_point, False, sent_at, time.time(), error=str(error)
+            )
+
+        result = HostResult(
+            end_point,
+            response.status_code == 200,
+            sent_at,
+            time.time(),
+            status_code=response.status_code,
+        )
+        if not result.ok:
+            result.error = response.text
+        return response, result
+
+    def _start_host(self, end_point: str, path: str, payload) -> HostResult:
+        response, result = self._post(end_point, path, payload)
+        if response is None or not result.ok:
+            return result
+        try:
+            payload = response.json()
+        except ValueError:
+            # Something other than a recorder answered on this end point
+            result.ok = False
+            result.error = f"Invalid JSON response: {response.text[:200]}"
+            return result
+        if not isinstance(payload, dict):
+            result.ok = False
+            result.error = f"Unexpected response: {payload!r}"
+            return result
+        result.payload = payload
+        if "error" in payload:
+            result.ok = False
+            result.error = payload["error"]
+        return result
+
+    def _download(self, response, result: HostResult, output_file: str):
+        """Stream a stop response body to disk without buffering it in memory."""
+        content_type = response.headers.get("content-type", "")
+        try:
+            if content_type.startswith("application/json"):
+                # The server answers with JSON when no recording was found
+                result.ok = False
+                result.error = response.text
+                return result
+            with open(output_file, "wb") as file:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    if chunk:
+                        file.write(chunk)
+            result.output_file = output_file
+            logger.info("File saved: %s", os.path.abspath(output_file))
+        except (requests.RequestException, OSError) as error:
+            result.ok = False
+            result.error = str(error)
+        finally:
+            response.close()
+        return result
+
+    async def start(
+        self, mode: str = "video", screen_index: int = 1, fps: int = 10
+    ) -> list[HostResult]:
+        """
+        Start recording on every host at the same time.
+
+        Args:
+            mode (str): Either ``"video"`` or ``"audio"``.
+            screen_index (int): The index of the screen to record (video only).
+            fps (int): Frames per second for the video recording (video only).
+
+        Returns:
+            list[HostResult]: One result per host, in the order of ``end_points``.
+        """
+        path = MODES[mode]["start"]
+        payload = (
+            {"screen_index": screen_index, "fps": fps} if mode == "video" else None
+        )
+        results = await asyncio.gather(
+            *(
+                self._run(self._start_host, end_point, path, payload)
+                for end_point in self.end_points
+            )
+        )
+        for result in results:
+            if result.ok:
+                logger.info("Recording started on %s", result.end_point)
+            else:
+                logger.error(
+                    "Failed to start recording on %s: %s",
+                    result.end_point,
+                    result.error,
+                )
+        return list(results)
+
+    async def stop(
+        self, mode: str = "video", output_dir: str = "."
+    ) -> list[HostResult]:
+        """
+        Stop recording on every host at the same time and download the files.
+
+        All stop requests are sent concurrently so that recordings end together,
+        then the response bodies are downloaded with at most ``max_concurrency``
+        transfers in flight.
+
+        Args:
+            mode (str): Either ``"video"`` or ``"audio"``.
+            output_dir (str): The directory where the recordings are saved.
+
+        Returns:
+            list[HostResult]: One result per host, in the order of ``end_points``.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        path = MODES[mode]["stop"]
+        responses = await asyncio.gather(
+            *(
+                self._run(self._post, end_point, path, None, True)
+                for end_point in self.end_points
+            )
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def download(response, result):
+            if response is None or not result.ok:
+                if response is not None:
+                    response.close()
+                logger.error(
+                    "Failed to stop recording on %s: %s",
+                    result.end_point,
+                    result.error,
+                )
+                return result
+            async with semaphore:
+                output_file = output_file_for(result.end_point, mode, output_dir)
+                return await self._run(self._download, response, result, output_file)
+
+        results = await asyncio.gather(
+            *(download(response, result) for response, result in responses)
+        )
+        return list(results)
+
+    async def record(
+        self,
+        duration: float,
+        mode: str = "video",
+        screen_index: int = 1,
+        fps: int = 10,
+        output_dir: str = ".",
+    ) -> tuple[list[HostResult], list[HostResult]]:
+        """
+        Record on every host for a fixed duration and download the results.
+
+        Returns:
+            tuple: The start results and the stop results.
+        """
+        start_results = await self.start(mode, screen_index=screen_index, fps=fps)
+        await asyncio.sleep(duration)
+        stop_results = await self.stop(mode, output_dir=output_dir)
+        return start_results, stop_results
+
+
+def log_skew_report(report: SkewReport):
+    """
+    Log the per-host start-time skew.
+
+    Args:
+        report (SkewReport): The report returned by ``compute_start_skew``.
+    """
+    for end_point, offset in sorted(report.offsets.items(), key=lambda item: item[1]):
+        handled_offset = report.handled_offsets.get(end_point)
+        if handled_offset is None:
+            logger.info("%s acknowledged start at +%.1f ms", end_point, offset * 1000)
+        else:
+            logger.info(
+                "%s acknowledged start at +%.1f ms (handled at +%.1f ms on server clock)",
+                end_point,
+                offset * 1000,
+                handled_offset * 1000,
+            )
+    if report.offsets:
+        logger.info(
+            "Start request skew: max %.1f ms, median %.1f ms",
+            report.max_skew * 1000,
+            statistics.median(report.offsets.values()) * 1000,
+        )
+
+
+def read_hosts(hosts: list[str], hosts_file: Optional[str]) -> list[str]:
+    """
+    Merge hosts given on the command line with hosts listed in a file.
+
+    Args:
+        hosts (list[str]): End points given on the command line.
+        hosts_file (str): Optional file with one end point per line.
+
+    Returns:
+        list[str]: The de-duplicated end points, in order.
+    """
+    end_points = list(hosts or [])
+    if hosts_file:
+        with open(hosts_file, encoding="utf-8") as file:
+            for line in file:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    end_points.append(line)
+    return list(dict.fromkeys(end_points))
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments for the fleet controller.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Start and stop recordings on many pyrecorder hosts at once"
+    )
+    parser.add_argument(
+        "--hosts",
+        action="extend",
+        type=lambda value: [host for host in value.split(",") if host],
+        default=[],
+        help="Comma-separated end points, e.g. http://10.0.0.2:8000,http://10.0.0.3:8000",
+    )
+    parser.add_argument(
+        "--hosts-file", help="File with one end point per line ('#' starts a comment)"
+    )
+    parser.add_argument(
+        "--mode", choices=sorted(MODES), default="video", help="What to record"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="Request timeout in seconds"
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = subparsers.add_parser("start", help="Start recording on all hosts")
+    stop_parser = subparsers.add_parser(
+        "stop", help="Stop recording on all hosts and download the files"
+    )
+    record_parser = subparsers.add_parser(
+        "record", help="Start, wait for a duration, then stop and download"
+    )
+    record_parser.add_argument(
+        "--duration", type=float, required=True, help="Recording length in seconds"
+    )
+
+    for sub_parser in (start_parser, record_parser):
+        sub_parser.add_argument(
+            "--screen-index", type=int, default=1, help="Screen to record (1-based)"
+        )
+        sub_parser.add_argument(
+            "--fps", type=int, default=10, help="Frames per second for video"
+        )
+    for sub_parser in (stop_parser, record_parser):
+        sub_parser.add_argument(
+            "--output-dir", default=".", help="Directory for downloaded recordings"
+        )
+        sub_parser.add_argument(
+            "--max-concurrency", type=int, default=4, help="Parallel downloads"
+        )
+    return parser.parse_args(argv)
+
+
+async def run(args) -> bool:
+    """
+    Run the fleet command described by the parsed arguments.
+
+    Returns:
+        bool: True if every host succeeded.
+    """
+    end_points = read_hosts(args.hosts, args.hosts_file)
+    with FleetController(
+        end_points,
+        max_concurrency=getattr(args, "max_concurrency", 4),
+        timeout=args.timeout,
+    ) as controller:
+        results = []
+        if args.command == "start":
+            results = await controller.start(
+                args.mode, screen_index=args.screen_index, fps=args.fps
+            )
+            log_skew_report(compute_start_skew(results))
+        elif args.command == "stop":
+            results = await controller.stop(args.mode, output_dir=args.output_dir)
+        else:
+            start_results, stop_results = await controller.record(
+                args.duration,
+                args.mode,
+                screen_index=args.screen_index,
+                fps=args.fps,
+                output_dir=args.output_dir,
+            )
+            log_skew_report(compute_start_skew(start_results))
+            results = start_results + stop_results
+    return all(result.ok for result in results)
+
+
+def main(argv=None):
+    """
+    Entry point of the ``pyrecorder-fleet`` command.
+    """
+    args = parse_args(argv)
+    if not read_hosts(args.hosts, args.hosts_file):
+        raise SystemExit("No hosts given: use --hosts or --hosts-file")
+    ok = asyncio.run(run(args))
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
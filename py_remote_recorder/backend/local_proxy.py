@@ -0,0 +1,192 @@
+"""
+This module provides a minimal local reverse proxy used as an offline stand-in
+for ngrok. It forwards every request on a listen port to the local server and
+serves an ngrok-compatible ``/api/tunnels`` endpoint on a separate port.
+"""
+
+import argparse
+import http.client
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Headers that only apply to a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+
+# Headers replaced by the proxy: the body is re-chunked, and BaseHTTPRequestHandler
+# already sends its own Date and Server headers
+REPLACED_HEADERS = {"content-length", "date", "server"}
+
+# Status codes that never carry a response body
+BODYLESS_STATUSES = {204, 304}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def make_proxy_handler(target_host, target_port):
+    """
+    Build a request handler that forwards requests to the target server.
+
+    Args:
+        target_host (str): Host of the server being exposed.
+        target_port (int): Port of the server being exposed.
+
+    Returns:
+        type: A BaseHTTPRequestHandler subclass.
+    """
+
+    class ProxyHandler(BaseHTTPRequestHandler):
+        """Forward any request to the target server and stream the response back."""
+
+        protocol_version = "HTTP/1.1"
+
+        def forward(self):
+            """Forward the current request."""
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else None
+            headers = {
+                key: value
+                for key, value in self.headers.items()
+                if key.lower() not in HOP_BY_HOP_HEADERS
+            }
+
+            connection = http.client.HTTPConnection(target_host, target_port)
+            try:
+                connection.request(self.command, self.path, body=body, headers=headers)
+                response = connection.getresponse()
+            except OSError as error:
+                connection.close()
+                self.send_error(502, f"Bad gateway: {error}")
+                return
+
+            try:
+                has_body = (
+                    response.status >= 200 and response.status not in BODYLESS_STATUSES
+                )
+                self.send_response(response.status, response.reason)
+                for key, value in response.getheaders():
+                    if key.lower() not in HOP_BY_HOP_HEADERS | REPLACED_HEADERS:
+                        self.send_header(key, value)
+                if not has_body:
+                    self.end_headers()
+                    return
+                # Re-chunk the body so that streamed responses are not buffered
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                while chunk := response.read1(CHUNK_SIZE):
+                    self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+            finally:
+                connection.close()
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = forward
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            """Silence the default per-request logging."""
+
+    return ProxyHandler
+
+
+def make_api_handler(public_url, target_port):
+    """
+    Build a request handler serving an ngrok-compatible tunnels API.
+
+    Args:
+        public_url (str): The URL clients should use to reach the proxy.
+        target_port (int): Port of the server being exposed.
+
+    Returns:
+        type: A BaseHTTPRequestHandler subclass.
+    """
+    tunnel_data = json.dumps(
+        {
+            "tunnels": [
+                {
+                    "name": "local",
+                    "public_url": public_url,
+                    "proto": "http",
+                    "config": {"addr": f"http://localhost:{target_port}"},
+                }
+            ]
+        }
+    ).encode()
+
+    class ApiHandler(BaseHTTPRequestHandler):
+        """Answer GET /api/tunnels with the proxy address."""
+
+        def do_GET(self):
+            """Serve the tunnel list."""
+            if self.path.rstrip("/") != "/api/tunnels":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(tunnel_data)))
+            self.end_headers()
+            self.wfile.write(tunnel_data)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            """Silence the default per-request logging."""
+
+    return ApiHandler
+
+
+def parse_args(argv=None):
+    """
+    Parse command-line arguments for the local proxy.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Local stand-in for an ngrok tunnel")
+    parser.add_argument(
+        "--target-port", type=int, required=True, help="Port of the server to expose"
+    )
+    parser.add_argument(
+        "--listen-port", type=int, required=True, help="Port the proxy listens on"
+    )
+    parser.add_argument(
+        "--api-port", type=int, required=True, help="Port of the tunnels API"
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Address the proxy binds to"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Run the proxy and the tunnels API until interrupted.
+    """
+    args = parse_args(argv)
+    proxy = ThreadingHTTPServer(
+        (args.host, args.listen_port),
+        make_proxy_handler("127.0.0.1", args.target_port),
+    )
+    # The API is only bound once the proxy is listening, so readiness is exact
+    api = ThreadingHTTPServer(
+        ("127.0.0.1", args.api_port),
+        make_api_handler(f"http://{args.host}:{args.listen_port}", args.target_port),
+    )
+    threading.Thread(target=proxy.serve_forever, daemon=True).start()
+    try:
+        api.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.server_close()
+        proxy.shutdown()
+        proxy.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""
+This module builds a sidecar index for finished recordings so that viewers can
+seek and preview without decoding the whole file. The index holds keyframe
+offsets, periodic JPEG thumbnails, an RMS waveform summary for audio and
+activity markers, and is generated in a background thread after the recording
+file has been closed.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import struct
+import threading
+import wave
+
+from py_remote_recorder.utils import get_logger
+
+logger = get_logger()
+
+# Seconds between two video thumbnails
+THUMBNAIL_INTERVAL = 10
+# Width in pixels of the video thumbnails (height keeps the aspect ratio)
+THUMBNAIL_WIDTH = 320
+# Mean absolute difference (0-255) between frames one second apart that counts as activity
+VIDEO_ACTIVITY_THRESHOLD = 2.0
+# Length in seconds of each audio RMS window
+WAVEFORM_WINDOW = 0.1
+# RMS level (relative to full scale, about -40 dBFS) that counts as audio activity
+AUDIO_ACTIVITY_THRESHOLD = 0.01
+
+# Index generation state of each recording: "pending", "ready" or "failed"
+index_status = {}
+
+# Generation of the latest recording of each file. File names are reused, so a
+# build only publishes its index if no newer recording has started since.
+index_generation = {}
+_generations = itertools.count(1)
+_index_lock = threading.Lock()
+
+
+def index_path(output_file):
+    """
+    Return the path of the sidecar index of a recording.
+
+    Args:
+        output_file (str): The path to the recording.
+
+    Returns:
+        str: The path to the JSON index.
+    """
+    return f"{output_file}.index.json"
+
+
+def thumbnails_dir(output_file):
+    """
+    Return the directory holding the thumbnails of a recording.
+
+    Args:
+        output_file (str): The path to the recording.
+
+    Returns:
+        str: The path to the thumbnails directory.
+    """
+    return f"{output_file}.thumbs"
+
+
+def discard_index(output_file):
+    """
+    Remove the sidecar index of a recording that is about to be overwritten and
+    mark its index as pending. Builds still running for the previous recording
+    are invalidated and will not publish their result.
+
+    Args:
+        output_file (str): The path to the recording.
+
+    Returns:
+        int: The generation of the new recording, to pass to start_index_build.
+    """
+    with _index_lock:
+        generation = next(_generations)
+        index_generation[output_file] = generation
+        index_status[output_file] = "pending"
+        if os.path.exists(index_path(output_file)):
+            os.remove(index_path(output_file))
+        shutil.rmtree(thumbnails_dir(output_file), ignore_errors=True)
+    return generation
+
+
+def mark_index_failed(output_file, generation):
+    """
+    Mark the index of a recording as failed, e.g. when the recording itself failed
+    before any index could be built.
+
+    Args:
+        output_file (str): The path to the recording.
+        generation (int): The generation returned by discard_index.
+    """
+    with _index_lock:
+        if index_generation.get(output_file) == generation:
+            index_status[output_file] = "failed"
+
+
+def activity_segments(flags, step):
+    """
+    Merge consecutive active windows into segments.
+
+    Args:
+        flags (iterable): One boolean per window, True when the window is active.
+        step (float): Length of a window in seconds.
+
+    Returns:
+        list[dict]: Segments with "start" and "end" times in seconds.
+    """
+    segments = []
+    start = None
+    position = -1
+    for position, active in enumerate(flags):
+        if active and start is None:
+            start = position
+        elif not active and start is not None:
+            segments.append(
+                {"start": round(start * step, 3), "end": round(position * step, 3)}
+            )
+            start = None
+    if start is not None:
+        segments.append(
+            {"start": round(start * step, 3), "end": round((position + 1) * step, 3)}
+        )
+    return segments
+
+
+def _iter_boxes(data, start, end):
+    """Yield the type, payload start and end of each MP4 box in a buffer."""
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[position : position + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[position + 8 : position + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return
+        yield box_type.decode("latin-1"), position + header, position + size
+        position += size
+
+
+def _find_box(data, start, end, box_type):
+    """Return the payload bounds of the first child box of a given type."""
+    for child_type, child_start, child_end in _iter_boxes(data, start, end):
+        if child_type == box_type:
+            return child_start, child_end
+    return None
+
+
+def _read_moov(file):
+    """Read the MP4 movie box into memory without loading the media data."""
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
+    position = 0
+    while position + 8 <= file_size:
+        file.seek(position)
+        header = file.read(16)
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - position
+        if size < header_size:
+            return None
+        if box_type == b"moov":
+            file.seek(position + header_size)
+            return file.read(size - header_size)
+        position += size
+    return None
+
+
+def _table(data, start, fmt, fields):
+    """Unpack a full-box table made of an entry count followed by fixed-size entries."""
+    (count,) = struct.unpack(">I", data[start + 4 : start + 8])
+    entry = struct.Struct(">" + fmt * fields)
+    return [
+        entry.unpack_from(data, start + 8 + index * entry.size)
+        for index in range(count)
+    ]
+
+
+def read_keyframes(video_file):
+    """
+    Read the keyframe times and byte offsets from the MP4 sample tables.
+
+    Args:
+        video_file (str): The path to the MP4 file.
+
+    Returns:
+        list[dict]: Keyframes with "time" in seconds and byte "offset" in the file,
+        or an empty list if the sample tables are missing or malformed.
+    """
+    try:
+        with open(video_file, "rb") as file:
+            moov = _read_moov(file)
+        if moov is None:
+            return []
+        return _parse_keyframes(moov)
+    except (struct.error, TypeError, IndexError, ZeroDivisionError) as error:
+        # A missing box unpacks as None, a truncated one runs past the buffer
+        logger.warning("Could not read keyframes of %s: %s", video_file, error)
+        return []
+
+
+def _parse_keyframes(moov):  # pylint: disable=too-many-locals,too-many-branches
+    """Compute the keyframes of the first video track of a movie box."""
+    for box_type, trak_start, trak_end in _iter_boxes(moov, 0, len(moov)):
+        if box_type != "trak":
+            continue
+        mdia = _find_box(moov, trak_start, trak_end, "mdia")
+        hdlr = mdia and _find_box(moov, *mdia, "hdlr")
+        if not hdlr or moov[hdlr[0] + 8 : hdlr[0] + 12] != b"vide":
+            continue
+
+        mdhd = _find_box(moov, *mdia, "mdhd")
+        timescale_offset = 20 if moov[mdhd[0]] == 1 else 12
+        (timescale,) = struct.unpack(
+            ">I", moov[mdhd[0] + timescale_offset : mdhd[0] + timescale_offset + 4]
+        )
+        stbl = _find_box(moov, *_find_box(moov, *mdia, "minf"), "stbl")
+        boxes = {
+            box: _find_box(moov, *stbl, box)
+            for box in ("stts", "stss", "stsz", "stsc", "stco", "co64")
+        }
+
+        # Decode time of each sample (composition offsets from ctts are ignored)
+        times = []
+        elapsed = 0
+        for count, delta in _table(moov, boxes["stts"][0], "I", 2):
+            for _ in range(count):
+                times.append(elapsed / timescale)
+                elapsed += delta
+
+        # Size of each sample
+        stsz = boxes["stsz"][0]
+        sample_size, count = struct.unpack(">II", moov[stsz + 4 : stsz + 12])
+        if sample_size:
+            sizes = [sample_size] * count
+        else:
+            sizes = list(struct.unpack_from(f">{count}I", moov, stsz + 12))
+
+        # Byte offset of each sample, from the chunk offsets and the samples per chunk
+        if boxes["stco"]:
+            chunk_offsets = [row[0] for row in _table(moov, boxes["stco"][0], "I", 1)]
+        else:
+            chunk_offsets = [row[0] for row in _table(moov, boxes["co64"][0], "Q", 1)]
+        runs = _table(moov, boxes["stsc"][0], "I", 3)
+        offsets = []
+        for run_index, (first_chunk, samples_per_chunk, _) in enumerate(runs):
+            last_chunk = (
+                runs[run_index + 1][0] - 1
+                if run_index + 1 < len(runs)
+                else len(chunk_offsets)
+            )
+            for chunk in range(first_chunk, last_chunk + 1):
+                offset = chunk_offsets[chunk - 1]
+                for _ in range(samples_per_chunk):
+                    if len(offsets) == len(sizes):
+                        break
+                    offsets.append(offset)
+                    offset += sizes[len(offsets) - 1]
+
+        # Without a sync sample table every sample is a keyframe
+        if boxes["stss"]:
+            sync_samples = [row[0] for row in _table(moov, boxes["stss"][0], "I", 1)]
+        else:
+            sync_samples = range(1, len(offsets) + 1)
+        return [
+            {"time": round(times[sample - 1], 3), "offset": offsets[sample - 1]}
+            for sample in sync_samples
+            if sample <= min(len(times), len(offsets))
+        ]
+    return []
+
+
+def build_video_index(video_file, thumbs_dir=None):  # pylint: disable=too-many-locals
+    """
+    Build the index of a video recording in a single decoding pass.
+
+    Args:
+        video_file (str): The path to the video file.
+        thumbs_dir (str): Where to write the thumbnails (default: next to the file).
+
+    Returns:
+        dict: The index content.
+    """
+    # Imported here so that audio-only hosts and the server start do not load OpenCV
+    import cv2  # pylint: disable=import-outside-toplevel
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    thumbs_dir = thumbs_dir or thumbnails_dir(video_file)
+    os.makedirs(thumbs_dir, exist_ok=True)
+
+    capture = cv2.VideoCapture(video_file)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 10
+    frames_per_second = max(1, round(fps))
+    frames_per_thumbnail = frames_per_second * THUMBNAIL_INTERVAL
+
+    thumbnails = []
+    activity = []
+    previous = None
+    frame_index = 0
+    try:
+        # grab() skips the colour conversion of frames that are not inspected
+        while capture.grab():
+            if frame_index % frames_per_second == 0:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                second = frame_index / fps
+
+                small = cv2.resize(
+                    cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), (64, 36)
+                ).astype(np.float32)
+                if previous is not None:
+                    activity.append(
+                        float(np.mean(np.abs(small - previous)))
+                        > VIDEO_ACTIVITY_THRESHOLD
+                    )
+                previous = small
+
+                if frame_index % frames_per_thumbnail == 0:
+                    height, width = frame.shape[:2]
+                    thumbnail = cv2.resize(
+                        frame,
+                        (THUMBNAIL_WIDTH, max(1, height * THUMBNAIL_WIDTH // width)),
+                    )
+                    name = f"thumb_{int(second):06d}.jpg"
+                    cv2.imwrite(os.path.join(thumbs_dir, name), thumbnail)
+                    thumbnails.append({"time": round(second, 3), "file": name})
+            frame_index += 1
+    finally:
+        capture.release()
+
+    # activity[n] compares second n with second n + 1, so a segment [start, end]
+    # covers every change that happened between those two seconds
+    return {
+        "file": os.path.basename(video_file),
+        "kind": "video",
+        "duration": round(frame_index / fps, 3),
+        "fps": fps,
+        "keyframes": read_keyframes(video_file),
+        "thumbnail_interval": THUMBNAIL_INTERVAL,
+        "thumbnails": thumbnails,
+        "activity": activity_segments(activity, 1.0),
+    }
+
+
+def build_audio_index(audio_file):
+    """
+    Build the index of a WAV recording: an RMS waveform summary and activity markers.
+
+    Args:
+        audio_file (str): The path to the WAV file.
+
+    Returns:
+        dict: The index content.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    with wave.open(audio_file, "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        window = max(1, int(rate * WAVEFORM_WINDOW))
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[sample_width]
+        full_scale = float(2 ** (8 * sample_width - 1))
+
+        rms = []
+        while data := wav.readframes(window):
+            samples = np.frombuffer(data, dtype=dtype).astype(np.float64)
+            if sample_width == 1:
+                # 8-bit WAV samples are unsigned
+                samples -= 128
+            samples = samples.reshape(-1, channels) / full_scale
+            rms.append(float(np.sqrt(np.mean(np.square(samples)))))
+        duration = wav.getnframes() / rate
+
+    levels = np.array(rms)
+    return {
+        "file": os.path.basename(audio_file),
+        "kind": "audio",
+        "duration": round(duration, 3),
+        "keyframes": [],
+        "thumbnails": [],
+        "waveform": {
+            "window": WAVEFORM_WINDOW,
+            "rms": [round(level, 4) for level in rms],
+        },
+        "activity": activity_segments(
+            levels > AUDIO_ACTIVITY_THRESHOLD, WAVEFORM_WINDOW
+        ),
+    }
+
+
+def _publish_index(output_file, generation, index, staging_thumbs_dir):
+    """
+    Write the index and move its thumbnails in place, unless a newer recording
+    of the same file has started since the build began.
+
+    Returns:
+        bool: True if the index was published.
+    """
+    with _index_lock:
+        if index_generation.get(output_file) != generation:
+            return False
+
+        # Write to a temporary file first so readers never see a partial index
+        temporary_path = index_path(output_file) + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(index, file)
+        os.replace(temporary_path, index_path(output_file))
+
+        shutil.rmtree(thumbnails_dir(output_file), ignore_errors=True)
+        if os.path.isdir(staging_thumbs_dir):
+            os.replace(staging_thumbs_dir, thumbnails_dir(output_file))
+        index_status[output_file] = "ready"
+        return True
+
+
+def build_index(output_file, kind, generation):
+    """
+    Build the sidecar index of a recording and write it next to the file.
+
+    Args:
+        output_file (str): The path to the recording.
+        kind (str): Either "video" or "audio".
+        generation (int): The recording generation the build belongs to.
+    """
+    # Thumbnails are staged per generation so that a stale build never mixes
+    # its files into the thumbnails of a newer recording
+    staging_thumbs_dir = f"{thumbnails_dir(output_file)}.{generation}"
+    try:
+        if kind == "video":
+            index = build_video_index(output_file, thumbs_dir=staging_thumbs_dir)
+        else:
+            index = build_audio_index(output_file)
+
+        if _publish_index(output_file, generation, index, staging_thumbs_dir):
+            logger.info("Index saved to %s", index_path(output_file))
+        else:
+            logger.info("Discarded stale index of %s", output_file)
+    except Exception as error:  # pylint: disable=broad-except
+        with _index_lock:
+            if index_generation.get(output_file) == generation:
+                index_status[output_file] = "failed"
+        logger.error("Error building index for %s: %s", output_file, error)
+    finally:
+        shutil.rmtree(staging_thumbs_dir, ignore_errors=True)
+
+
+def start_index_build(output_file, kind, generation):
+    """
+    Build the sidecar index of a finished recording in a background thread.
+
+    Args:
+        output_file (str): The path to the recording.
+        kind (str): Either "video" or "audio".
+        generation (int): The generation returned by discard_index when the
+            recording started.
+    """
+    with _index_lock:
+        if index_generation.get(output_file) != generation:
+            # A newer recording of the same file has started since
+            return
+    threading.Thread(
+        target=build_index, args=(output_file, kind, generation), daemon=True
+    ).start()
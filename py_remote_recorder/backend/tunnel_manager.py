@@ -0,0 +1,267 @@
+"""
+This module provides a supervised tunnel process used to expose the local
+FastAPI server publicly. The tunnel is started as a subprocess, its public URL
+is polled from an ngrok-compatible ``/api/tunnels`` endpoint with exponential
+backoff, and the process is restarted if it exits unexpectedly.
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from py_remote_recorder.utils import get_logger
+
+logger = get_logger()
+
+
+def find_free_port():
+    """
+    Ask the operating system for a free local TCP port.
+
+    Returns:
+        int: A port number that was free at the time of the call.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def ngrok_provider(server_port):
+    """
+    Build the command and inspection API URL for an ngrok tunnel.
+
+    Args:
+        server_port (int): The local server port to expose.
+
+    Returns:
+        tuple: The command to run and the URL of its tunnels API.
+    """
+    return ["ngrok", "http", str(server_port)], "http://localhost:4040/api/tunnels"
+
+
+def local_provider(server_port):
+    """
+    Build the command and API URL for the local reverse-proxy stand-in.
+
+    The stand-in forwards a free local port to the server and serves an
+    ngrok-compatible tunnels API, so the startup path works offline.
+
+    Args:
+        server_port (int): The local server port to expose.
+
+    Returns:
+        tuple: The command to run and the URL of its tunnels API.
+    """
+    api_port = find_free_port()
+    command = [
+        sys.executable,
+        "-m",
+        "py_remote_recorder.backend.local_proxy",
+        "--target-port",
+        str(server_port),
+        "--listen-port",
+        str(find_free_port()),
+        "--api-port",
+        str(api_port),
+    ]
+    return command, f"http://127.0.0.1:{api_port}/api/tunnels"
+
+
+# Available tunnel providers, selected with the --tunnel command-line option
+TUNNEL_PROVIDERS = {
+    "ngrok": ngrok_provider,
+    "local": local_provider,
+}
+
+
+class TunnelManager:  # pylint: disable=too-many-instance-attributes
+    """
+    Start, supervise and stop a tunnel process for the local server.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        server_port,
+        provider="ngrok",
+        timeout=15.0,
+        initial_delay=0.05,
+        max_delay=1.0,
+        max_restarts=3,
+    ):
+        """
+        Args:
+            server_port (int): The local server port to expose.
+            provider (str): The name of a provider in TUNNEL_PROVIDERS.
+            timeout (float): Seconds to wait for the tunnel to become ready.
+            initial_delay (float): First delay between readiness polls, in seconds.
+            max_delay (float): Upper bound of the delay between polls, in seconds.
+            max_restarts (int): How many times a crashed tunnel is restarted.
+        """
+        if provider not in TUNNEL_PROVIDERS:
+            raise ValueError(f"Unknown tunnel provider: {provider}")
+
+        self.server_port = server_port
+        self.provider = provider
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_restarts = max_restarts
+
+        self.process = None
+        self.public_url = None
+        self.ready_after = None
+        self.restarts = 0
+        self._api_url = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._supervisor = None
+
+    @property
+    def running(self):
+        """Whether the tunnel process is alive."""
+        return self.process is not None and self.process.poll() is None
+
+    def status(self):
+        """
+        Describe the tunnel for the API.
+
+        Returns:
+            dict: The provider, public URL and process state.
+        """
+        return {
+            "provider": self.provider,
+            "public_url": self.public_url,
+            "running": self.running,
+            "ready_after": self.ready_after,
+            "restarts": self.restarts,
+        }
+
+    def _launch(self):
+        """Start the tunnel subprocess."""
+        command, self._api_url = TUNNEL_PROVIDERS[self.provider](self.server_port)
+        # The output is discarded: an unread pipe would eventually block the tunnel
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _fetch_public_url(self):
+        """
+        Read the public URL from the tunnels API.
+
+        Returns:
+            str: The public URL, or None if no tunnel is listed yet.
+        """
+        with urllib.request.urlopen(self._api_url, timeout=1) as response:
+            tunnel_data = json.load(response)
+        tunnels = tunnel_data.get("tunnels") or []
+        # Prefer the HTTPS endpoint when ngrok exposes both
+        tunnels.sort(key=lambda tunnel: tunnel.get("proto") != "https")
+        return tunnels[0]["public_url"] if tunnels else None
+
+    def _wait_ready(self):
+        """
+        Poll the tunnels API with exponential backoff until a URL is available.
+
+        Returns:
+            str: The public URL, or None if the tunnel did not become ready.
+        """
+        started = time.perf_counter()
+        deadline = started + self.timeout
+        delay = self.initial_delay
+        while not self._stopping.is_set():
+            if not self.running:
+                logger.error("Tunnel process exited during startup.")
+                return None
+            try:
+                public_url = self._fetch_public_url()
+            except (OSError, ValueError):
+                # The API is not listening yet or answered with partial data
+                public_url = None
+            if public_url:
+                self.ready_after = time.perf_counter() - started
+                return public_url
+            if time.perf_counter() + delay > deadline:
+                logger.error("Tunnel not ready after %.1f seconds.", self.timeout)
+                return None
+            self._stopping.wait(delay)
+            delay = min(delay * 2, self.max_delay)
+        return None
+
+    def _supervise(self):
+        """Restart the tunnel if its process exits while it should be running."""
+        while not self._stopping.is_set():
+            returncode = self.process.wait()
+            if self._stopping.is_set():
+                return
+            logger.error("Tunnel process exited with code %d.", returncode)
+            with self._lock:
+                # stop() may have run since the exit; it must win over a restart
+                if self._stopping.is_set():
+                    return
+                self.public_url = None
+                if self.restarts >= self.max_restarts:
+                    logger.error("Tunnel restarted too many times, giving up.")
+                    return
+                self.restarts += 1
+                try:
+                    self._launch()
+                except OSError as error:
+                    logger.error("Error restarting %s tunnel: %s", self.provider, error)
+                    return
+                self.public_url = self._wait_ready()
+            if self.public_url:
+                logger.info("Tunnel restarted at %s", self.public_url)
+
+    def start(self):
+        """
+        Start the tunnel and wait until its public URL is available.
+
+        Returns:
+            str: The public URL of the tunnel, or None if it failed to start.
+        """
+        self._stopping.clear()
+        with self._lock:
+            try:
+                self._launch()
+            except OSError as error:
+                logger.error("Error starting %s tunnel: %s", self.provider, error)
+                return None
+            self.public_url = self._wait_ready()
+
+        if self.public_url is None:
+            self.stop()
+            return None
+
+        logger.info(
+            "Tunnel ready in %.0f ms using %s.", self.ready_after * 1000, self.provider
+        )
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+        return self.public_url
+
+    def stop(self, timeout=5.0):
+        """
+        Stop the tunnel process, killing it if it does not exit in time.
+
+        Args:
+            timeout (float): Seconds to wait for a graceful exit.
+        """
+        # Set before taking the lock so that a restart waiting for readiness gives up
+        self._stopping.set()
+        with self._lock:
+            process = self.process
+            if process is not None and process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            self.public_url = None
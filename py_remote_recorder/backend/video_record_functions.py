@@ -8,15 +8,19 @@ import time
 import cv2
 import mss
 import numpy as np
-import pyautogui
 from screeninfo import get_monitors
 
+from py_remote_recorder.backend.recording_index import (
+    discard_index,
+    mark_index_failed,
+    start_index_build,
+)
+
 # Global flag to signal when to stop the recording
 stop_recording_flag = False
-pyautogui.FAILSAFE = False  # Disable PyAutoGUI failsafe
 
 
-def record_screen(screen, output_file="output.avi", fps=10):
+def record_screen(screen, output_file="output.avi", fps=10, generation=None):
     """
     Record the selected screen and save the recording to a video file.
 
@@ -24,6 +28,7 @@ def record_screen(screen, output_file="output.avi", fps=10):
         screen: The screen object containing position and dimensions.
         output_file (str): The path to the output video file (default: 'output.avi').
         fps (int): Frames per second for the video recording (default: 20).
+        generation (int): Index generation from discard_index, if already taken.
     """
     monitor = {
         "top": screen.y,
@@ -32,37 +37,54 @@ def record_screen(screen, output_file="output.avi", fps=10):
         "height": screen.height,
     }
 
-    with mss.mss() as sct:
-        # Set up the video writer with the XVID codec
-        fourcc = cv2.VideoWriter_fourcc(*"avc1")
-        out = cv2.VideoWriter(output_file, fourcc, fps, (screen.width, screen.height))
-
-        try:
-            while not stop_recording_flag:  # Check stop flag inside the loop
-                # Capture the screen and convert it to a NumPy array
-                img = np.array(sct.grab(monitor))
-
-                # Convert the captured image to BGR format for OpenCV
-                img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-
-                # Write the BGR frame to the video file
-                out.write(img_bgr)
-
-                # Delay to maintain the desired frame rate
-                time.sleep(1 / fps)
-        finally:
-            # Release the video writer and close OpenCV windows
-            out.release()
-            cv2.destroyAllWindows()
-
-
-def start_screen_recording(screen_index: int, output_file="output.avi", fps=10):
+    # Remove the index of a previous recording with the same file name
+    if generation is None:
+        generation = discard_index(output_file)
+
+    try:
+        with mss.mss() as sct:
+            # Set up the video writer with the XVID codec
+            fourcc = cv2.VideoWriter_fourcc(*"avc1")
+            out = cv2.VideoWriter(
+                output_file, fourcc, fps, (screen.width, screen.height)
+            )
+
+            try:
+                while not stop_recording_flag:  # Check stop flag inside the loop
+                    # Capture the screen and convert it to a NumPy array
+                    img = np.array(sct.grab(monitor))
+
+                    # Convert the captured image to BGR format for OpenCV
+                    img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+
+                    # Write the BGR frame to the video file
+                    out.write(img_bgr)
+
+                    # Delay to maintain the desired frame rate
+                    time.sleep(1 / fps)
+            finally:
+                # Release the video writer and close OpenCV windows
+                out.release()
+                cv2.destroyAllWindows()
+    except Exception:
+        # No index will be built, so do not leave it pending
+        mark_index_failed(output_file, generation)
+        raise
+
+    # Build the seek/preview index once the file is complete
+    start_index_build(output_file, "video", generation)
+
+
+def start_screen_recording(
+    screen_index: int, output_file="output.avi", fps=10, generation=None
+):
     """
     Start screen recording for the specified screen index.
 
     Args:
         screen_index (int): The index of the screen to record (1-based index).
         output_file (str): The path to the output video file (default: 'output.avi').
+        generation (int): Index generation from discard_index, if already taken.
 
     Raises:
         ValueError: If the screen index is invalid.
@@ -70,18 +92,29 @@ def start_screen_recording(screen_index: int, output_file="output.avi", fps=10):
     global stop_recording_flag
     stop_recording_flag = False  # Reset the stop flag before starting
 
-    # Get all available screens
-    screens = get_monitors()
+    # Remove the index of a previous recording with the same file name
+    if generation is None:
+        generation = discard_index(output_file)
+
+    try:
+        # Get all available screens
+        screens = get_monitors()
 
-    # Validate the screen index
-    if screen_index < 1 or screen_index > len(screens):
-        raise ValueError("Invalid screen index")
+        # Validate the screen index
+        if screen_index < 1 or screen_index > len(screens):
+            raise ValueError("Invalid screen index")
+    except Exception:
+        # No index will be built, so do not leave it pending
+        mark_index_failed(output_file, generation)
+        raise
 
     # Select the screen based on the provided index
     selected_screen = screens[screen_index - 1]
 
     # Start recording the selected screen
-    record_screen(selected_screen, output_file=output_file, fps=fps)
+    record_screen(
+        selected_screen, output_file=output_file, fps=fps, generation=generation
+    )
 
 
 def stop_screen_recording():
@@ -8,19 +8,23 @@ import logging.config
 
 import uvicorn
 
+# Whether Uvicorn's logging configuration has already been applied
+_logging_configured = False
+
 
 def get_logger():
     """
     Configures the logging using Uvicorn's logging configuration and returns a logger.
+    The configuration is applied only on the first call.
 
     Returns:
         logging.Logger: The logger instance configured using Uvicorn's settings.
     """
-    # Get Uvicorn's default logging configuration
-    log_config = uvicorn.config.LOGGING_CONFIG
-
-    # Apply the logging configuration
-    logging.config.dictConfig(log_config)
+    global _logging_configured
+    if not _logging_configured:
+        # Apply Uvicorn's default logging configuration
+        logging.config.dictConfig(uvicorn.config.LOGGING_CONFIG)
+        _logging_configured = True
 
     # Retrieve and return the Uvicorn logger
     logger = logging.getLogger("uvicorn")
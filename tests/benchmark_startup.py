@@ -0,0 +1,83 @@
+"""
+Import-time and startup benchmark for the pyrecorder entry point.
+"""
+
+# Rest of benchmark_startup.py
+
+
+import statistics
+import subprocess
+import sys
+
+# Modules that should only be imported once a recording backend is used
+HEAVY_MODULES = ["cv2", "mss", "numpy", "pyautogui", "pyaudio", "screeninfo"]
+
+IMPORT_SNIPPET = f"""
+import sys
+import time
+
+start = time.perf_counter()
+import py_remote_recorder.__main__
+elapsed = time.perf_counter() - start
+loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+BACKEND_SNIPPET = """
+import sys
+import time
+
+import py_remote_recorder.__main__ as server
+
+start = time.perf_counter()
+try:
+    server.load_backend(sys.argv[1])
+except ImportError as error:
+    print("unavailable", error)
+else:
+    print(time.perf_counter() - start)
+"""
+
+
+def run_snippet(snippet, *args):
+    """
+    Run a snippet in a fresh interpreter so that every measurement is a cold start.
+
+    Returns:
+        str: The standard output of the snippet.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout.strip()
+
+
+def benchmark_import(runs=10):
+    """
+    Measure the cold import time of the server module.
+
+    Returns:
+        tuple: The median import time in seconds and the heavy modules it loaded.
+    """
+    timings = []
+    loaded = ""
+    for _ in range(runs):
+        elapsed, _, loaded = run_snippet(IMPORT_SNIPPET).partition(" ")
+        timings.append(float(elapsed))
+    return statistics.median(timings), loaded
+
+
+if __name__ == "__main__":
+    median_import, heavy_loaded = benchmark_import()
+    print(f"Server import: {median_import * 1000:.1f} ms (median of 10 cold starts)")
+    print(f"Heavy modules loaded at import: {heavy_loaded or 'none'}")
+
+    for backend_name in ("audio", "video"):
+        output = run_snippet(BACKEND_SNIPPET, backend_name)
+        if output.startswith("unavailable"):
+            print(f"First {backend_name} backend load: {output}")
+        else:
+            print(f"First {backend_name} backend load: {float(output) * 1000:.1f} ms")
@@ -0,0 +1,29 @@
+"""
+Unit tests for the fleet controller functionality in py_remote_recorder.
+"""
+
+# Rest of test_fleet_part.py
+
+
+import asyncio
+
+from py_remote_recorder.backend.fleet_controller import (
+    FleetController,
+    compute_start_skew,
+    log_skew_report,
+)
+
+if __name__ == "__main__":
+    end_points = ["http://192.168.1.9:8000", "http://192.168.1.10:8000"]
+
+    async def record_fleet():
+        """Record screen 1 on every host for 3 seconds and download the files."""
+        with FleetController(end_points, max_concurrency=2) as controller:
+            start_results = await controller.start("video", screen_index=1, fps=10)
+            log_skew_report(compute_start_skew(start_results))
+
+            await asyncio.sleep(3)
+
+            await controller.stop("video", output_dir="fleet_recordings")
+
+    asyncio.run(record_fleet())
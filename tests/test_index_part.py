@@ -0,0 +1,35 @@
+"""
+Unit tests for the recording index functionality in py_remote_recorder.
+"""
+
+# Rest of test_index_part.py
+
+
+import time
+
+from py_remote_recorder.backend.call_apis import (
+    get_recording_index,
+    save_binary_file,
+    start_video_recording,
+    stop_video_recording,
+)
+
+if __name__ == "__main__":
+    current_end_point = "http://0.0.0.0:8000"
+
+    # Record screen 1 for a few seconds
+    start_video_recording(end_point=current_end_point, screen_index=1, fps=10)
+
+    time.sleep(15)
+
+    data = stop_video_recording(end_point=current_end_point)
+    save_binary_file(data, output_file="local_file.mp4")
+
+    # The index is built in the background after the recording stops
+    time.sleep(5)
+    index = get_recording_index(end_point=current_end_point, kind="video")
+
+    if index:
+        print(
+            f"{len(index['keyframes'])} keyframes, {len(index['thumbnails'])} thumbnails"
+        )